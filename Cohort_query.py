@@ -0,0 +1,154 @@
+import os
+import re
+import tempfile
+import numpy as np
+import pandas as pd
+
+# 原始数据文件，缓存文件与其同名、扩展名为 .pkl
+DATA_PATH = 'ThyroidCancer.xlsx'
+# 缓存格式版本，索引结构变化时递增
+CACHE_VERSION = 2
+
+# 建立位图索引的低基数字段
+index_columns = [
+    'Sex', 'Race recode (W, B, AI, API)', 'Radiation recode',
+    'SEER Combined Mets at DX-bone (2010+)', 'SEER Combined Mets at DX-brain (2010+)',
+    'SEER Combined Mets at DX-liver (2010+)', 'SEER Combined Mets at DX-lung (2010+)',
+    'Year of diagnosis'
+]
+
+# 定义亚组（队列）
+# 条件写法：单个值表示等于；list/set 表示取值之一；tuple (下限, 上限) 表示闭区间，None 表示不限；
+# 也可传入函数，接收该列并返回布尔序列；None 或 np.nan 表示缺失值
+# 'All' 队列的输出文件名与原先保持一致
+COHORTS = {
+    'All': {},
+    'Female': {'Sex': 'Female'},
+    'Diagnosed_2010+': {'Year of diagnosis': (2010, None)},
+    'Lung_Mets': {'SEER Combined Mets at DX-lung (2010+)': 'Yes'},
+    'Female_2010+_Lung_Mets': {
+        'Sex': 'Female',
+        'Year of diagnosis': (2010, None),
+        'SEER Combined Mets at DX-lung (2010+)': 'Yes'
+    },
+}
+
+
+def build_indexes(data, columns=index_columns):
+    # 为每个字段的每个取值建立布尔位图，缺失值的位图以 None 为键
+    indexes = {}
+    for col in columns:
+        if col not in data.columns:
+            continue
+        codes, uniques = pd.factorize(data[col])
+        indexes[col] = {value: codes == i for i, value in enumerate(uniques)}
+        indexes[col][None] = codes == -1
+    return indexes
+
+
+def load_data(path=DATA_PATH, cache_path=None):
+    # 优先读取缓存；Excel 文件的修改时间或大小、索引字段变化后重新读取并重建缓存
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"数据文件不存在：{path}")
+    if cache_path is None:
+        cache_path = os.path.splitext(path)[0] + '.pkl'
+    stat = os.stat(path)
+    source = (stat.st_mtime, stat.st_size)
+
+    if os.path.exists(cache_path):
+        cache = pd.read_pickle(cache_path)
+        if (cache.get('version') == CACHE_VERSION and cache.get('source') == source
+                and cache.get('index_columns') == index_columns):
+            return cache['data'], cache['indexes']
+
+    data = pd.read_excel(path)
+    indexes = build_indexes(data)
+    # 先写入同目录下的临时文件再替换，避免中断或并发运行留下不完整的缓存
+    # 缓存写入失败（如目录只读、缓存文件被占用）不影响本次分析
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(suffix='.pkl', dir=os.path.dirname(os.path.abspath(cache_path)))
+        os.close(fd)
+        cache = {'version': CACHE_VERSION, 'source': source, 'data': data, 'indexes': indexes,
+                 'index_columns': list(index_columns)}
+        pd.to_pickle(cache, tmp_path)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"警告：缓存文件写入失败，本次不使用缓存：{e}")
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return data, indexes
+
+
+def _column_mask(column, condition):
+    # 未建索引的字段直接在列上做向量化比较
+    if callable(condition):
+        return np.asarray(condition(column), dtype=bool)
+    if isinstance(condition, tuple):
+        lo, hi = condition
+        mask = column.notna()
+        if lo is not None:
+            mask &= column >= lo
+        if hi is not None:
+            mask &= column <= hi
+        return mask.to_numpy()
+    if isinstance(condition, (list, set, frozenset)):
+        values = [v for v in condition if not pd.isna(v)]
+        mask = column.isin(values)
+        if len(values) < len(condition):
+            mask |= column.isna()
+        return mask.to_numpy()
+    if pd.isna(condition):
+        return column.isna().to_numpy()
+    return (column == condition).to_numpy()
+
+
+def _index_mask(index, condition, n_rows):
+    # 已建索引的字段通过位图按位或得到结果
+    if isinstance(condition, tuple):
+        lo, hi = condition
+        values = [v for v in index
+                  if v is not None and (lo is None or v >= lo) and (hi is None or v <= hi)]
+    elif isinstance(condition, (list, set, frozenset)):
+        values = condition
+    else:
+        values = [condition]
+
+    mask = np.zeros(n_rows, dtype=bool)
+    for value in values:
+        if pd.isna(value):
+            value = None
+        if value in index:
+            mask |= index[value]
+    return mask
+
+
+def cohort_mask(data, indexes, definition):
+    # 各条件按位与，返回行掩码
+    mask = np.ones(len(data), dtype=bool)
+    for col, condition in definition.items():
+        if col not in data.columns:
+            raise KeyError(f"队列条件中的字段不存在：{col}")
+        if col in indexes and not callable(condition):
+            mask &= _index_mask(indexes[col], condition, len(data))
+        else:
+            mask &= _column_mask(data[col], condition)
+    return mask
+
+
+def select_cohort(data, indexes, definition):
+    # 返回副本，分析脚本可直接在其上做转换和填充
+    return data[cohort_mask(data, indexes, definition)].copy()
+
+
+def iter_cohorts(cohorts=COHORTS, path=DATA_PATH, cache_path=None):
+    # 数据只读取一次，依次返回 (队列名, 文件名后缀, 队列数据)
+    data, indexes = load_data(path, cache_path)
+    for name, definition in cohorts.items():
+        subset = select_cohort(data, indexes, definition)
+        if subset.empty:
+            print(f"队列 {name} 没有样本，已跳过。")
+            continue
+        suffix = '' if name == 'All' else '_' + re.sub(r'[\\/*?:"<>|\s]', '_', name)
+        print(f"队列 {name}：{len(subset)} 例")
+        yield name, suffix, subset
@@ -3,13 +3,11 @@ import numpy as np
 from lifelines import CoxPHFitter
 import matplotlib.pyplot as plt
 import matplotlib
+from Cohort_query import COHORTS, iter_cohorts
 
 # 使用非GUI后端
 matplotlib.use('Agg')
 
-# 读取数据
-data = pd.read_excel('ThyroidCancer.xlsx')
-
 # 定义数值转换字典
 conversion_dict = {
     'Age': {
@@ -49,20 +47,6 @@ conversion_dict = {
     }
 }
 
-# 将文本类型的特征转换为数值
-for col, mapping in conversion_dict.items():
-    if col in data.columns:
-        data[col] = data[col].map(mapping).fillna(data[col])
-
-# 填充缺失值
-# 对数值型特征使用中位数填充
-for col in data.select_dtypes(include=[np.number]).columns:
-    data[col].fillna(data[col].median(), inplace=True)
-
-# 对分类型特征使用众数填充
-for col in data.select_dtypes(include=[object]).columns:
-    data[col].fillna(data[col].mode()[0], inplace=True)
-
 # 定义特征和标签
 feature_columns = [
     'Age', 'Sex', 'Year of diagnosis', 'Race recode (W, B, AI, API)',
@@ -75,51 +59,75 @@ feature_columns = [
     'CS tumor size (2004-2015)', 'CS extension (2004-2015)', 'Marital status at diagnosis'
 ]
 
-# 提取生存时间和生存状态
-T = data['Survival Time']
-E = (data['Year of death recode'] > 0).astype(int)  # 将死亡年份大于0的记录视为事件发生
-
-# 删除缺失值过多的列，阈值设置为50%
-threshold = len(data) * 0.5
-filtered_feature_columns = [col for col in feature_columns if data[col].isnull().sum() <= threshold]
-
-print(f"过滤后的特征列：{filtered_feature_columns}")
-
-# 保存所有变量的Cox回归结果
-summary_list = []
-
-# 逐一对每个变量进行Cox回归分析
-for col in filtered_feature_columns:
-    df = pd.DataFrame({
-        col: data[col],
-        'T': T,
-        'E': E
-    })
-
-    # 将分类变量转换为独热编码
-    df = pd.get_dummies(df, drop_first=True)
-
+# 对每个队列分别进行分析
+for name, suffix, data in iter_cohorts(COHORTS):
     try:
-        cph = CoxPHFitter()
-        cph.fit(df, duration_col='T', event_col='E')
-
-        # 保存每个变量的结果
-        summary = cph.summary
-        summary['variable'] = col
-        summary_list.append(summary)
-
-        # 绘制并保存图表
-        plt.figure(figsize=(10, 6))
-        cph.plot()
-        plt.title(f'Cox Regression for {col}')
-        plt.tight_layout()
-        plt.savefig(f'CoxPH_Regression_{col.replace(" ", "_").replace("/", "_")}.png')
-        plt.close()
+        # 将文本类型的特征转换为数值
+        for col, mapping in conversion_dict.items():
+            if col in data.columns:
+                data[col] = data[col].map(mapping).fillna(data[col])
+
+        # 填充缺失值
+        # 对数值型特征使用中位数填充
+        for col in data.select_dtypes(include=[np.number]).columns:
+            data[col].fillna(data[col].median(), inplace=True)
+
+        # 对分类型特征使用众数填充
+        for col in data.select_dtypes(include=[object]).columns:
+            # 亚组中可能整列为空，此时没有众数可用
+            if data[col].notna().any():
+                data[col].fillna(data[col].mode()[0], inplace=True)
+
+        # 提取生存时间和生存状态
+        T = data['Survival Time']
+        E = (data['Year of death recode'] > 0).astype(int)  # 将死亡年份大于0的记录视为事件发生
+
+        # 删除缺失值过多的列，阈值设置为50%
+        threshold = len(data) * 0.5
+        filtered_feature_columns = [col for col in feature_columns if data[col].isnull().sum() <= threshold]
+
+        print(f"[{name}] 过滤后的特征列：{filtered_feature_columns}")
+
+        # 保存所有变量的Cox回归结果
+        summary_list = []
+
+        # 逐一对每个变量进行Cox回归分析
+        for col in filtered_feature_columns:
+            df = pd.DataFrame({
+                col: data[col],
+                'T': T,
+                'E': E
+            })
+
+            # 将分类变量转换为独热编码
+            df = pd.get_dummies(df, drop_first=True)
+
+            try:
+                cph = CoxPHFitter()
+                cph.fit(df, duration_col='T', event_col='E')
+
+                # 保存每个变量的结果
+                summary = cph.summary
+                summary['variable'] = col
+                summary_list.append(summary)
+
+                # 绘制并保存图表
+                plt.figure(figsize=(10, 6))
+                cph.plot()
+                plt.title(f'Cox Regression for {col}' + (f' ({name})' if suffix else ''))
+                plt.tight_layout()
+                plt.savefig(f'CoxPH_Regression_{col.replace(" ", "_").replace("/", "_")}{suffix}.png')
+                plt.close()
+            except Exception as e:
+                print(f"[{name}] Error in processing {col}: {e}")
+
+        # 将所有结果汇总为一个DataFrame并保存为CSV文件
+        if summary_list:
+            all_summaries = pd.concat(summary_list)
+            all_summaries.to_csv(f'CoxPH_Regression_Summaries{suffix}.csv', index=False)
     except Exception as e:
-        print(f"Error in processing {col}: {e}")
-
-# 将所有结果汇总为一个DataFrame并保存为CSV文件
-all_summaries = pd.concat(summary_list)
-all_summaries.to_csv('CoxPH_Regression_Summaries.csv', index=False)
+        # 单个队列出错时记录并继续分析其余队列
+        print(f"[{name}] Cox回归分析失败：{e}")
+        plt.close('all')
 
 print("Cox回归分析已完成，结果已保存。")
@@ -3,13 +3,11 @@ import matplotlib.pyplot as plt
 from lifelines import KaplanMeierFitter
 import matplotlib
 import re
+from Cohort_query import COHORTS, iter_cohorts
 
 # 使用非GUI后端
 matplotlib.use('Agg')
 
-# 读取数据
-data = pd.read_excel('ThyroidCancer.xlsx')
-
 # 定义要分析的变量
 variables = [
     'Age', 'Sex', 'Year of diagnosis', 'Race recode (W, B, AI, API)', 'Grade Pathological (2018+)',
@@ -28,38 +26,45 @@ kmf = KaplanMeierFitter()
 def sanitize_filename(filename):
     return re.sub(r'[\\/*?:"<>|]', "_", filename)
 
-for var in variables:
-    # 检查变量是否存在空值并删除这些行
-    df = data.dropna(subset=[var, 'Survival Time'])
+# 对每个队列分别进行分析
+for name, suffix, data in iter_cohorts(COHORTS):
+    try:
+        for var in variables:
+            # 检查变量是否存在空值并删除这些行
+            df = data.dropna(subset=[var, 'Survival Time'])
 
-    # 分组变量
-    groups = df[var].unique()
+            # 分组变量
+            groups = df[var].unique()
 
-    plt.figure(figsize=(12, 8))
+            plt.figure(figsize=(12, 8))
 
-    for group in groups:
-        # 选择某一组的数据
-        ix = df[var] == group
-        kmf.fit(df['Survival Time'][ix], event_observed=df['Year of death recode'][ix], label=str(group))
-        kmf.plot_survival_function(ci_show=True)
+            for group in groups:
+                # 选择某一组的数据
+                ix = df[var] == group
+                kmf.fit(df['Survival Time'][ix], event_observed=df['Year of death recode'][ix], label=str(group))
+                kmf.plot_survival_function(ci_show=True)
 
-    plt.title(f'Kaplan-Meier Survival Curve: {var}', fontsize=16)
-    plt.xlabel('Time (years)', fontsize=14)
-    plt.ylabel('Survival Probability', fontsize=14)
+            plt.title(f'Kaplan-Meier Survival Curve: {var}' + (f' ({name})' if suffix else ''), fontsize=16)
+            plt.xlabel('Time (years)', fontsize=14)
+            plt.ylabel('Survival Probability', fontsize=14)
 
-    # 调整图例的位置
-    plt.legend(title=var, loc='center left', bbox_to_anchor=(1, 0.5), fontsize=12, title_fontsize='13')
+            # 调整图例的位置
+            plt.legend(title=var, loc='center left', bbox_to_anchor=(1, 0.5), fontsize=12, title_fontsize='13')
 
-    # 显示网格
-    plt.grid(True)
+            # 显示网格
+            plt.grid(True)
 
-    # 添加注释
-    # plt.annotate('This is a Kaplan-Meier Survival Curve', xy=(0.5, 0.1), xycoords='axes fraction',
-    #              fontsize=12, ha='center', va='center', bbox=dict(boxstyle="round,pad=0.3", edgecolor="black", facecolor="white"))
+            # 添加注释
+            # plt.annotate('This is a Kaplan-Meier Survival Curve', xy=(0.5, 0.1), xycoords='axes fraction',
+            #              fontsize=12, ha='center', va='center', bbox=dict(boxstyle="round,pad=0.3", edgecolor="black", facecolor="white"))
 
-    # 处理文件名中的特殊字符
-    safe_var = sanitize_filename(var)
-    plt.savefig(f'KM_Survival_Curve_{safe_var}.png', bbox_inches='tight')
-    plt.close()
+            # 处理文件名中的特殊字符
+            safe_var = sanitize_filename(var)
+            plt.savefig(f'KM_Survival_Curve_{safe_var}{suffix}.png', bbox_inches='tight')
+            plt.close()
+    except Exception as e:
+        # 单个队列出错时记录并继续分析其余队列
+        print(f"[{name}] 生存分析失败：{e}")
+        plt.close('all')
 
 print("生存曲线已生成并保存。")